@@ -10,9 +10,14 @@ from flask import Flask, jsonify, request
 from flask_cors import CORS
 import threading
 import time
+import traceback
 import json
+import logging
+import os
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime
 import queue
+from collections import deque
 import numpy as np
 
 from bci_motor_imagery_complete import (
@@ -21,9 +26,47 @@ from bci_motor_imagery_complete import (
 )
 from brainflow.board_shim import BoardIds
 
+# WebSocket push channel (optional — falls back to HTTP polling)
+try:
+    from flask_socketio import SocketIO
+    SOCKETIO_AVAILABLE = True
+except ImportError:
+    print("Warning: flask_socketio not installed. Trigger push disabled.")
+    print("Install with: pip install flask-socketio")
+    SOCKETIO_AVAILABLE = False
+
+# Production WSGI server (optional — falls back to Flask's dev server)
+try:
+    from waitress import serve
+    WAITRESS_AVAILABLE = True
+except ImportError:
+    WAITRESS_AVAILABLE = False
+
+# Fast JSON responses (optional — falls back to Flask's jsonify)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 app = Flask(__name__)
 CORS(app)  # Allow Flutter to make requests
 
+
+def fast_jsonify(payload):
+    """jsonify drop-in backed by orjson when it is installed.
+
+    The polled endpoints serialize small dicts at up to ~30Hz; orjson
+    formats them several times faster than the stdlib encoder and holds
+    the GIL for less time.
+    """
+    if orjson is None:
+        return jsonify(payload)
+    return app.response_class(orjson.dumps(payload), mimetype='application/json')
+
+# 'threading' async mode keeps the existing background threads working
+# without eventlet/gevent monkey-patching.
+sio = SocketIO(app, cors_allowed_origins='*', async_mode='threading') if SOCKETIO_AVAILABLE else None
+
 # Global state
 bci_state = {
     'status': 'idle',  # idle, calibrating, training, detecting
@@ -38,12 +81,83 @@ bci_state = {
     'erd_values': {},
     'calibration_complete': False, 
     'hardware_initialized': False,
+    'version': 0,   # bumped by the detection thread on every state change
 }
 
-# Communication queues
-command_queue = queue.Queue()
+# Writers copy-update-swap the dict under a lock; readers just grab the
+# current reference (a dict reference load/store is atomic in CPython), so
+# request handlers never see a half-updated state or a dict mid-resize.
+_state_lock = threading.Lock()
+
+
+def update_state(**changes):
+    """Atomically publish a new bci_state snapshot with the given changes."""
+    global bci_state
+    with _state_lock:
+        new_state = dict(bci_state)
+        new_state.update(changes)
+        bci_state = new_state
+
+
+def load_cached_baseline():
+    """Load a recent baseline from disk. Returns True on success."""
+    global baseline
+    try:
+        if not os.path.exists(_BASELINE_CACHE):
+            return False
+        age = time.time() - os.path.getmtime(_BASELINE_CACHE)
+        if age > _BASELINE_CACHE_MAX_AGE:
+            print(f"[init] Baseline cache is {age / 3600:.1f}h old — ignoring")
+            return False
+        with np.load(_BASELINE_CACHE) as cached:
+            baseline = {key: float(cached[key]) for key in cached.files}
+        print(f"[init] Loaded cached baseline from {_BASELINE_CACHE}")
+        return True
+    except Exception as exc:
+        print(f"[init] Failed to load baseline cache: {exc}")
+        return False
+
+
+# Background workers log through a queue so console I/O happens on a
+# dedicated listener thread instead of blocking the calibration/training/
+# detection loops on stdout's lock and line flushes.
+_log_queue = queue.Queue(-1)
+_log_listener = QueueListener(_log_queue, logging.StreamHandler())
+_log_listener.start()
+
+logger = logging.getLogger('bci_bridge')
+logger.setLevel(logging.INFO)
+logger.addHandler(QueueHandler(_log_queue))
+
+# Communication queues. The manual-trigger path only ever appends/pops one
+# small token, so a bounded deque (lock-free for append/popleft in CPython)
+# replaces the Condition-based queue.Queue there.
+command_queue = deque(maxlen=64)
 event_queue = queue.Queue()
 
+# Set by /training/trial_start; run_training blocks on this instead of
+# polling the status string every 100ms.
+trial_event = threading.Event()
+
+# Set by /detection/stop (and shutdown) — the detection loop gates on this
+# and waits on it between batches, so a stop takes effect immediately
+# instead of after the next sleep expires.
+stop_event = threading.Event()
+
+# Hot-loop constants — bound once at import so the per-sample loops avoid
+# repeated attribute lookups on the Config class.
+_C3_IDX = Config.C3_CHANNEL - 1   # index into stream.eeg_channels
+_C4_IDX = Config.C4_CHANNEL - 1
+_SR     = Config.SAMPLING_RATE
+_MU     = Config.MU_BAND
+_BETA   = Config.BETA_BAND
+_BANDS  = {'mu': _MU, 'beta': _BETA}
+
+# Baseline cache — lets a warm restart skip the 60s recollection when the
+# hardware and electrodes haven't changed.
+_BASELINE_CACHE = os.path.join(Config.LOG_DIR, 'baseline_cache.npz')
+_BASELINE_CACHE_MAX_AGE = 24 * 3600  # seconds
+
 # BCI components (global references)
 stream = None
 processor = None
@@ -62,31 +176,29 @@ def get_status():
 
     Returns keys matching BCIStatus.fromJson() in bci_service.dart.
     """
-    return jsonify({
+    state = bci_state  # single consistent snapshot
+    return fast_jsonify({
         # Flutter-facing keys
-        'initialized':      bci_state['hardware_initialized'],
-        'calibrated':       bci_state.get('calibration_complete', False),
+        'initialized':      state['hardware_initialized'],
+        'calibrated':       state.get('calibration_complete', False),
         'trained':          classifier is not None,
-        'detecting':        bci_state['status'] == 'detecting',
-        'mode':             bci_state['status'],
-        'last_confidence':  bci_state.get('confidence', 0.0),
+        'detecting':        state['status'] == 'detecting',
+        'mode':             state['status'],
+        'last_confidence':  state.get('confidence', 0.0),
         # Extra detail
-        'baseline_progress': bci_state.get('baseline_progress', 0),
-        'current_trial':     bci_state.get('current_trial', 0),
-        'total_trials':      bci_state.get('total_trials', 0),
+        'baseline_progress': state.get('baseline_progress', 0),
+        'current_trial':     state.get('current_trial', 0),
+        'total_trials':      state.get('total_trials', 0),
     })
 
 
 @app.route('/calibration/start', methods=['POST'])
 def start_calibration():
     """Start baseline calibration (60 seconds)"""
-    global bci_state
-    
     if bci_state['status'] != 'idle':
         return jsonify({'error': 'System busy'}), 400
     
-    bci_state['status'] = 'calibrating'
-    bci_state['baseline_progress'] = 0
+    update_state(status='calibrating', baseline_progress=0)
     
     # Start calibration in background thread
     threading.Thread(target=run_calibration, daemon=True).start()
@@ -97,25 +209,34 @@ def start_calibration():
 @app.route('/calibration/progress', methods=['GET'])
 def get_calibration_progress():
     """Get calibration progress (0-100%)"""
-    return jsonify({
+    return fast_jsonify({
         'progress': bci_state['baseline_progress'],
         'status': bci_state['status']
     })
 
 @app.route('/calibration/status', methods=['GET'])
 def calibration_status():
-    return jsonify({
+    return fast_jsonify({
         'complete': bci_state.get('calibration_complete', False),
         'status': bci_state.get('status'),
         'progress': bci_state.get('baseline_progress', 0)
     })
 
 
+@app.route('/calibration/invalidate', methods=['POST'])
+def invalidate_calibration():
+    """Drop the cached baseline and force a fresh calibration."""
+    global baseline
+    baseline = None
+    update_state(calibration_complete=False)
+    if os.path.exists(_BASELINE_CACHE):
+        os.remove(_BASELINE_CACHE)
+    return jsonify({'message': 'Baseline invalidated — run calibration again'})
+
+
 @app.route('/training/start', methods=['POST'])
 def start_training():
     """Start training session"""
-    global bci_state, baseline
-    
     if not bci_state.get('calibration_complete', False):
         return jsonify({'error': 'Calibration failed or not completed'}), 400
 
@@ -127,9 +248,8 @@ def start_training():
     print("TRAINING SESSION STARTING")
     print("="*60)
     
-    bci_state['status'] = 'training'
-    bci_state['current_trial'] = 0
-    bci_state['total_trials'] = Config.TRAINING_TRIALS
+    update_state(status='training', current_trial=0,
+                 total_trials=Config.TRAINING_TRIALS)
     
     # Start training in background thread
     threading.Thread(target=run_training, daemon=True).start()
@@ -143,12 +263,11 @@ def start_training():
 @app.route('/training/trial_start', methods=['POST'])
 def trial_start():
     """Signal that Flutter animation has started - begin collecting data"""
-    global bci_state
-    
     current_status = bci_state['status']
     
     if current_status == 'training':
-        bci_state['status'] = 'collecting_trial'
+        update_state(status='collecting_trial')
+        trial_event.set()
         print("Trial collection triggered by Flutter")
         return jsonify({'message': 'Trial data collection started'})
     else:
@@ -160,14 +279,14 @@ def trial_start():
 @app.route('/training/trigger', methods=['POST'])
 def manual_trigger():
     """Manual trigger for training (when button is pressed)"""
-    command_queue.put('trigger')
+    command_queue.append('trigger')
     return jsonify({'message': 'Trigger received'})
 
 
 @app.route('/training/progress', methods=['GET'])
 def get_training_progress():
     """Get training progress"""
-    return jsonify({
+    return fast_jsonify({
         'current_trial': bci_state['current_trial'],
         'total_trials': bci_state['total_trials'],
         'status': bci_state['status']
@@ -177,13 +296,14 @@ def get_training_progress():
 @app.route('/detection/start', methods=['POST'])
 def start_detection():
     """Start real-time motor imagery detection"""
-    global bci_state, detector
+    global detector
     
     if classifier is None:
         return jsonify({'error': 'Training must be completed first'}), 400
     
-    bci_state['status'] = 'detecting'
-    
+    update_state(status='detecting')
+    stop_event.clear()
+
     # Start detector in background thread
     threading.Thread(target=run_detection, daemon=True).start()
     
@@ -193,30 +313,42 @@ def start_detection():
 @app.route('/detection/stop', methods=['POST'])
 def stop_detection():
     """Stop real-time detection"""
-    global bci_state
-    bci_state['status'] = 'idle'
+    stop_event.set()
+    update_state(status='idle')
     return jsonify({'message': 'Detection stopped'})
 
 
 @app.route('/detection/poll', methods=['GET'])
 def poll_detection():
-    """Poll for motor imagery detection (call this repeatedly from Flutter)"""
-    trigger = bci_state['trigger_detected']
-    
+    """Poll for motor imagery detection (call this repeatedly from Flutter)
+
+    Clients may pass ?since=<version> from the previous response; when
+    nothing has changed the poll returns 304 with an empty body instead of
+    re-serializing the same payload.
+    """
+    state = bci_state  # single consistent snapshot
+
+    since = request.args.get('since', type=int)
+    if since is not None and since == state['version']:
+        return ('', 304)
+
+    trigger = state['trigger_detected']
+
     # Reset trigger after reading
     if trigger:
-        bci_state['trigger_detected'] = False
-    
-    return jsonify({
+        update_state(trigger_detected=False)
+
+    return fast_jsonify({
         'trigger': trigger,
-        'confidence': bci_state['confidence'],
-        'erd_values': bci_state['erd_values'],
-        'timestamp': bci_state['last_trigger_time']
+        'confidence': state['confidence'],
+        'erd_values': state['erd_values'],
+        'timestamp': state['last_trigger_time'],
+        'version': state['version']
     })
 
 @app.route('/system/initialize', methods=['POST']) # ONLY INITIALIZE ONCE IN MAIN
 def initialize_system():
-    global stream, processor, bci_state
+    global stream, processor
 
     if bci_state['hardware_initialized']:
         print("Initialize called again — ignored")
@@ -234,7 +366,7 @@ def initialize_system():
     # Run the slow stream.start() (Neuropawn config takes ~15s) in a
     # background thread so the HTTP response returns immediately.
     # Flutter polls /status to know when initialization is complete.
-    bci_state['status'] = 'initializing'
+    update_state(status='initializing')
 
     def _do_init():
         global stream, processor
@@ -252,16 +384,14 @@ def initialize_system():
 
             # Mark as initialized BEFORE the slow channel config
             # so Flutter sees it immediately. Config runs in background.
-            bci_state['hardware_initialized'] = True
-            bci_state['status']               = 'idle'
+            update_state(hardware_initialized=True, status='idle')
             print("=" * 60)
             print("EEG HARDWARE INITIALIZATION COMPLETE")
             print("Flutter will now see initialized=True on next /status poll")
             print("=" * 60)
 
             # Now run channel config in background — won't block Flutter
-            import time as _time
-            _time.sleep(2)   # brief stabilization
+            time.sleep(2)   # brief stabilization
             # Run Neuropawn config — compare by board ID int value to be safe
             neuropawn_val = BoardIds.NEUROPAWN_KNIGHT_BOARD.value
             board_val = (stream.board_id.value
@@ -271,17 +401,20 @@ def initialize_system():
                 print("[init] Running Neuropawn channel configuration in background...")
                 stream.configure_neuropawn(Config.NUM_CHANNELS)
                 _ = stream.board.get_board_data()  # clear config-phase data
-                _time.sleep(3)
+                time.sleep(3)
                 print("[init] Neuropawn configuration complete. Ready for calibration.")
-                bci_state['channel_config_complete'] = True
+                update_state(channel_config_complete=True)
             else:
-                bci_state['channel_config_complete'] = True
+                update_state(channel_config_complete=True)
+
+            # Reuse a recent baseline so Flutter can go straight to training
+            if load_cached_baseline():
+                update_state(calibration_complete=True)
 
         except Exception as exc:
             print(f"[init] INITIALIZATION FAILED: {exc}")
-            import traceback; traceback.print_exc()
-            bci_state['hardware_initialized'] = False
-            bci_state['status'] = 'idle'
+            traceback.print_exc()
+            update_state(hardware_initialized=False, status='idle')
 
     threading.Thread(target=_do_init, daemon=True).start()
 
@@ -292,12 +425,14 @@ def initialize_system():
 @app.route('/system/shutdown', methods=['POST'])
 def shutdown_system():
     """Shutdown EEG hardware"""
-    global stream, bci_state
-    
+    global stream
+
+    stop_event.set()   # stop the detection loop before releasing the board
+
     if stream:
         stream.stop()
     
-    bci_state['status'] = 'idle'
+    update_state(status='idle')
     
     return jsonify({'message': 'System shutdown'})
 
@@ -308,66 +443,86 @@ def shutdown_system():
 
 def run_calibration():
     """Run baseline calibration in background."""
-    global baseline, bci_state, stream, processor
+    global baseline, stream, processor
 
-    print("\n" + "="*60)
-    print("BASELINE CALIBRATION STARTING")
-    print("="*60)
+    logger.info("\n" + "="*60)
+    logger.info("BASELINE CALIBRATION STARTING")
+    logger.info("="*60)
 
     if stream is None:
-        print("Error: EEG stream not initialized!")
-        bci_state['status'] = 'idle'
+        logger.info("Error: EEG stream not initialized!")
+        update_state(status='idle')
         return
 
     if processor is None:
-        print("Error: Signal processor not initialized!")
-        bci_state['status'] = 'idle'
+        logger.info("Error: Signal processor not initialized!")
+        update_state(status='idle')
         return
 
     try:
-        duration   = Config.BASELINE_DURATION
-        start_time = time.time()
-
-        # ── Progress updater thread ──────────────────────────────────────────
-        def update_progress():
-            while bci_state['status'] == 'calibrating':
-                elapsed  = time.time() - start_time
-                progress = min(99, int((elapsed / duration) * 100))
-                bci_state['baseline_progress'] = progress
-                time.sleep(1)
-
-        threading.Thread(target=update_progress, daemon=True).start()
+        duration = Config.BASELINE_DURATION
 
         # ── Wait for channel config to finish ────────────────────────────────
         # The background _do_init thread sets channel_config_complete=True when
         # configure_neuropawn() finishes. Poll until that flag is set, then
         # drain the buffer and settle. Max wait 90s.
-        print("Waiting for Neuropawn channel configuration to complete...")
+        logger.info("Waiting for Neuropawn channel configuration to complete...")
         wait_start = time.time()
         while not bci_state.get('channel_config_complete', False):
             time.sleep(1)
             elapsed = int(time.time() - wait_start)
             if elapsed % 5 == 0 and elapsed > 0:
-                print(f"  Still waiting for config... ({elapsed}s elapsed)")
+                logger.info(f"  Still waiting for config... ({elapsed}s elapsed)")
             if elapsed > 90:
-                print("  Config wait timed out — proceeding anyway")
+                logger.info("  Config wait timed out — proceeding anyway")
                 break
 
-        print("Channel config done. Clearing buffer and settling 3s...")
+        logger.info("Channel config done. Clearing buffer and settling 3s...")
         _ = stream.board.get_board_data()          # drain all config-phase data
         time.sleep(3)                               # extra settle for clean signal
 
+        # ── Channel indexing ─────────────────────────────────────────────────
+        # stream.eeg_channels = [1,2,3,4,5,6,7,8] — these are the ROW indices
+        # in BrainFlow's data matrix (not 0-based EEG positions).
+        # Config.C3_CHANNEL = 3  means the 3rd EEG electrode.
+        # eeg_channels[C3_CHANNEL - 1] = eeg_channels[2] = 3 → data row 3.
+        eeg_ch = stream.eeg_channels
+        c3_row = eeg_ch[_C3_IDX]   # correct BrainFlow row index
+        c4_row = eeg_ch[_C4_IDX]
+
+        logger.info(f"Using BrainFlow rows: C3={c3_row}, C4={c4_row}")
+
         # ── Collect ──────────────────────────────────────────────────────────
-        # Simply sleep for the baseline duration.  BrainFlow's acquisition
-        # thread silently fills its ring buffer the whole time.
-        # One get_board_data() call at the end drains everything reliably.
-        print(f">>> COLLECTING BASELINE ({duration}s) <<<")
-        start_time = time.time()                    # reset for progress calc
-        time.sleep(duration)
+        # Drain the board in chunks straight into a pre-allocated buffer so
+        # each sample is written exactly once — no list of small chunks and
+        # no second pass through np.hstack at the end.
+        logger.info(f">>> COLLECTING BASELINE ({duration}s) <<<")
+        start_time = time.time()
+
+        samples_needed = int(duration * _SR)
+        buf = np.empty((2, samples_needed), dtype=np.float32)
+
+        filled    = 0
+        last_prog = start_time
+        deadline  = start_time + duration + 10.0
+        while filled < samples_needed and time.time() < deadline:
+            chunk = stream.board.get_board_data()   # drain everything new
+            k = min(chunk.shape[1], samples_needed - filled)
+            if k > 0:
+                buf[0, filled:filled + k] = chunk[c3_row, :k]
+                buf[1, filled:filled + k] = chunk[c4_row, :k]
+                filled += k
+            else:
+                time.sleep(0.05)
 
-        data = stream.board.get_board_data()        # drain entire ring buffer
+            # Inline progress update (~1Hz) — no separate updater thread
+            now = time.time()
+            if now - last_prog > 1.0:
+                progress = min(99, int((now - start_time) / duration * 100))
+                update_state(baseline_progress=progress)
+                last_prog = now
 
-        if data is None or data.shape[1] == 0:
+        if filled == 0:
             raise RuntimeError(
                 f"No EEG data in buffer after {duration}s.\n"
                 "Possible causes:\n"
@@ -376,59 +531,55 @@ def run_calibration():
                 "  3. BrainFlow ring buffer was cleared elsewhere"
             )
 
-        print(f"Collected {data.shape[1]} samples "
-              f"({data.shape[1]/Config.SAMPLING_RATE:.1f}s at {Config.SAMPLING_RATE}Hz)")
+        logger.info(f"Collected {filled} samples "
+              f"({filled/_SR:.1f}s at {_SR}Hz)")
 
-        # ── Channel indexing ─────────────────────────────────────────────────
-        # stream.eeg_channels = [1,2,3,4,5,6,7,8] — these are the ROW indices
-        # in BrainFlow's data matrix (not 0-based EEG positions).
-        # Config.C3_CHANNEL = 3  means the 3rd EEG electrode.
-        # eeg_channels[C3_CHANNEL - 1] = eeg_channels[2] = 3 → data row 3.
-        eeg_ch = stream.eeg_channels
-        c3_row = eeg_ch[Config.C3_CHANNEL - 1]   # correct BrainFlow row index
-        c4_row = eeg_ch[Config.C4_CHANNEL - 1]
-
-        print(f"Using BrainFlow rows: C3={c3_row}, C4={c4_row}")
-
-        c3_data = data[c3_row]
-        c4_data = data[c4_row]
+        c3_data = buf[0, :filled]
+        c4_data = buf[1, :filled]
 
-        print(f"C3 samples: {len(c3_data)}, C4 samples: {len(c4_data)}")
+        logger.info(f"C3 samples: {len(c3_data)}, C4 samples: {len(c4_data)}")
 
         # ── Signal processing ────────────────────────────────────────────────
-        print("Processing signals...")
-        c3_clean = processor.preprocess(c3_data)
-        c4_clean = processor.preprocess(c4_data)
-
-        print("Computing baseline power...")
+        logger.info("Processing signals...")
+        # Filter both channels in one vectorized call on a (2, N) block
+        c3_clean, c4_clean = processor.preprocess(np.stack([c3_data, c4_data]))
+
+        logger.info("Computing baseline power...")
+        # One Welch PSD per channel; both band powers come from slicing it
+        c3_powers = processor.compute_psd_multi(c3_clean, _BANDS)
+        c4_powers = processor.compute_psd_multi(c4_clean, _BANDS)
         baseline = {
-            'c3_mu_power':   processor.compute_psd(c3_clean, Config.MU_BAND),
-            'c3_beta_power': processor.compute_psd(c3_clean, Config.BETA_BAND),
-            'c4_mu_power':   processor.compute_psd(c4_clean, Config.MU_BAND),
-            'c4_beta_power': processor.compute_psd(c4_clean, Config.BETA_BAND),
+            'c3_mu_power':   c3_powers['mu'],
+            'c3_beta_power': c3_powers['beta'],
+            'c4_mu_power':   c4_powers['mu'],
+            'c4_beta_power': c4_powers['beta'],
         }
 
-        bci_state['calibration_complete'] = True
-        bci_state['status']               = 'idle'
-        bci_state['baseline_progress']    = 100
+        # Cache to disk so a warm restart can skip the 60s recollection
+        try:
+            os.makedirs(Config.LOG_DIR, exist_ok=True)
+            np.savez(_BASELINE_CACHE, **baseline)
+        except Exception as exc:
+            logger.info(f"Warning: could not cache baseline: {exc}")
 
-        print("\n" + "="*60)
-        print("BASELINE CALIBRATION COMPLETE")
-        print("="*60)
-        print(f"C3 - Mu: {baseline['c3_mu_power']:.4f}  Beta: {baseline['c3_beta_power']:.4f}")
-        print(f"C4 - Mu: {baseline['c4_mu_power']:.4f}  Beta: {baseline['c4_beta_power']:.4f}")
-        print("="*60 + "\n")
+        update_state(calibration_complete=True, status='idle',
+                     baseline_progress=100)
+
+        logger.info("\n" + "="*60)
+        logger.info("BASELINE CALIBRATION COMPLETE")
+        logger.info("="*60)
+        logger.info(f"C3 - Mu: {baseline['c3_mu_power']:.4f}  Beta: {baseline['c3_beta_power']:.4f}")
+        logger.info(f"C4 - Mu: {baseline['c4_mu_power']:.4f}  Beta: {baseline['c4_beta_power']:.4f}")
+        logger.info("="*60 + "\n")
 
     except Exception as e:
-        print("\n" + "="*60)
-        print("CALIBRATION FAILED")
-        print("="*60)
-        print(f"Error: {e}")
-        import traceback
+        logger.info("\n" + "="*60)
+        logger.info("CALIBRATION FAILED")
+        logger.info("="*60)
+        logger.info(f"Error: {e}")
         traceback.print_exc()
-        print("="*60 + "\n")
-        bci_state['status']               = 'idle'
-        bci_state['calibration_complete'] = False
+        logger.info("="*60 + "\n")
+        update_state(status='idle', calibration_complete=False)
         baseline                          = None
 
 
@@ -442,162 +593,180 @@ def run_training():
  
     This gives the LDA classifier both classes to discriminate between.
     """
-    global classifier, bci_state, baseline, stream, processor
+    global classifier, baseline, stream, processor
  
     if baseline is None:
-        print("Error: Baseline not collected — run calibration first")
-        bci_state['status'] = 'idle'
+        logger.info("Error: Baseline not collected — run calibration first")
+        update_state(status='idle')
         return
  
-    print("\n" + "="*60)
-    print("TRAINING DATA COLLECTION")
-    print("="*60)
-    print(f"Collecting {Config.TRAINING_TRIALS} paired REST + IMAGERY trials")
-    print(f"(2 sets of {Config.TRAINING_TRIALS // 2} with a 60-second break in between)")
-    print("="*60 + "\n")
+    logger.info("\n" + "="*60)
+    logger.info("TRAINING DATA COLLECTION")
+    logger.info("="*60)
+    logger.info(f"Collecting {Config.TRAINING_TRIALS} paired REST + IMAGERY trials")
+    logger.info(f"(2 sets of {Config.TRAINING_TRIALS // 2} with a 60-second break in between)")
+    logger.info("="*60 + "\n")
  
     rest_trials    = []
     imagery_trials = []
+    trial_event.clear()   # drop any stale trigger from a previous session
  
     HALF = Config.TRAINING_TRIALS // 2  # = 20 for 40-trial sessions
  
     for trial_num in range(Config.TRAINING_TRIALS):
-        bci_state['current_trial'] = trial_num + 1
+        update_state(current_trial=trial_num + 1)
  
         # ── Mid-session break ────────────────────────────────────────────────
         if trial_num == HALF:
-            print("\n" + "="*60)
-            print("MID-SESSION BREAK")
-            print("="*60)
-            print(f"Completed {HALF}/{Config.TRAINING_TRIALS} trials.")
-            print("Take a 60-second break — relax, blink, stretch.")
-            print("Training will resume automatically.")
-            print("="*60)
-            bci_state['status'] = 'break'
+            logger.info("\n" + "="*60)
+            logger.info("MID-SESSION BREAK")
+            logger.info("="*60)
+            logger.info(f"Completed {HALF}/{Config.TRAINING_TRIALS} trials.")
+            logger.info("Take a 60-second break — relax, blink, stretch.")
+            logger.info("Training will resume automatically.")
+            logger.info("="*60)
+            update_state(status='break')
             time.sleep(60)
-            bci_state['status'] = 'training'
-            print("Break over — resuming training.\n")
+            update_state(status='training')
+            logger.info("Break over — resuming training.\n")
  
-        print(f"\n[Trial {trial_num + 1}/{Config.TRAINING_TRIALS}]")
+        logger.info(f"\n[Trial {trial_num + 1}/{Config.TRAINING_TRIALS}]")
  
         # ── Step 1: collect REST window immediately ──────────────────────────
         try:
-            print("  Collecting REST window...")
+            logger.info("  Collecting REST window...")
             rest_trial = collect_rest_trial_data(stream, processor, baseline)
             rest_trials.append(rest_trial)
-            print(f"  REST complete: C3μ={rest_trial['c3_mu_erd']:.1f}%, "
+            logger.info(f"  REST complete: C3μ={rest_trial['c3_mu_erd']:.1f}%, "
                   f"C4μ={rest_trial['c4_mu_erd']:.1f}%")
         except Exception as e:
-            print(f"  Error collecting REST trial: {e}")
-            import traceback; traceback.print_exc()
+            logger.info(f"  Error collecting REST trial: {e}")
+            traceback.print_exc()
             continue
  
         # ── Step 2: wait for Flutter animation trigger ───────────────────────
-        print("  Waiting for Flutter animation...")
-        wait_start = time.time()
-        while bci_state['status'] == 'training':
-            time.sleep(0.1)
-            if time.time() - wait_start > 30:
-                print("  Timeout waiting for trial trigger — skipping")
-                break
+        logger.info("  Waiting for Flutter animation...")
+        if not trial_event.wait(timeout=30):
+            logger.info("  Timeout waiting for trial trigger — skipping")
+        trial_event.clear()
  
         # ── Step 3: collect IMAGERY window ───────────────────────────────────
         if bci_state['status'] == 'collecting_trial':
-            print("  Animation started — collecting MOTOR IMAGERY window...")
+            logger.info("  Animation started — collecting MOTOR IMAGERY window...")
             try:
                 imagery_trial = collect_trial_data(stream, processor, baseline)
                 imagery_trials.append(imagery_trial)
-                print(f"  IMAGERY complete: C3μ={imagery_trial['c3_mu_erd']:.1f}%, "
+                logger.info(f"  IMAGERY complete: C3μ={imagery_trial['c3_mu_erd']:.1f}%, "
                       f"C4μ={imagery_trial['c4_mu_erd']:.1f}%")
             except Exception as e:
-                print(f"  Error collecting imagery trial: {e}")
-                import traceback; traceback.print_exc()
+                logger.info(f"  Error collecting imagery trial: {e}")
+                traceback.print_exc()
  
-            bci_state['status'] = 'training'
+            update_state(status='training')
         else:
-            print("  Training interrupted")
+            logger.info("  Training interrupted")
             break
  
     # ── Train classifier ─────────────────────────────────────────────────────
     paired_count   = min(len(rest_trials), len(imagery_trials))
     rest_trials    = rest_trials[:paired_count]
     imagery_trials = imagery_trials[:paired_count]
-    bci_state['current_trial'] = paired_count
+    update_state(current_trial=paired_count)
  
     if paired_count >= 10:
-        print("\n" + "="*60)
-        print("TRAINING CLASSIFIER")
-        print("="*60)
-        print(f"Using {paired_count} REST + {paired_count} IMAGERY trials")
+        logger.info("\n" + "="*60)
+        logger.info("TRAINING CLASSIFIER")
+        logger.info("="*60)
+        logger.info(f"Using {paired_count} REST + {paired_count} IMAGERY trials")
  
         try:
-            import os
             os.makedirs(Config.LOG_DIR, exist_ok=True)   # ensure dir exists
  
             classifier    = MIClassifier()
             training_data = prepare_training_data(rest_trials, imagery_trials)
             classifier.train(training_data)
-            print("Classifier trained successfully!")
-            print("="*60 + "\n")
+            logger.info("Classifier trained successfully!")
+            logger.info("="*60 + "\n")
         except Exception as e:
-            print(f"Classifier training failed: {e}")
-            import traceback; traceback.print_exc()
+            logger.info(f"Classifier training failed: {e}")
+            traceback.print_exc()
             classifier = None
     else:
-        print(f"\nNot enough paired trials ({paired_count}/{Config.TRAINING_TRIALS})")
+        logger.info(f"\nNot enough paired trials ({paired_count}/{Config.TRAINING_TRIALS})")
         classifier = None
  
-    bci_state['status'] = 'idle'
-    print("\nTraining session complete\n")
+    update_state(status='idle')
+    logger.info("\nTraining session complete\n")
  
  
+def collect_window_samples(stream, samples_needed):
+    """Drain the board into pre-allocated C3/C4 buffers until full.
+
+    Chunks are written straight into np.empty buffers by index, avoiding
+    per-sample Python appends and the final np.array() conversion pass.
+    Returns (c3, c4) trimmed to the samples actually collected.
+    """
+    c3 = np.empty(samples_needed, dtype=np.float32)
+    c4 = np.empty_like(c3)
+
+    eeg_ch = stream.eeg_channels
+    c3_row = eeg_ch[_C3_IDX]
+    c4_row = eeg_ch[_C4_IDX]
+
+    filled   = 0
+    deadline = time.time() + 2 * (samples_needed / _SR) + 2.0
+    while filled < samples_needed and time.time() < deadline:
+        chunk = stream.board.get_board_data()   # drain everything new
+        k = min(chunk.shape[1], samples_needed - filled)
+        if k > 0:
+            c3[filled:filled + k] = chunk[c3_row, :k]
+            c4[filled:filled + k] = chunk[c4_row, :k]
+            filled += k
+        else:
+            time.sleep(0.02)
+
+    return c3[:filled], c4[:filled]
+
+
 def collect_trial_data(stream, processor, baseline):
     """Collect EEG data for one IMAGERY trial (1.8s)."""
-    import time
-
     stream.clear_buffer()
     time.sleep(0.2)
 
     duration       = 1.8
-    samples_needed = int(duration * Config.SAMPLING_RATE)
-    print(f"  Collecting {samples_needed} samples ({duration}s)...")
-
-    time.sleep(duration)
+    samples_needed = int(duration * _SR)
+    logger.info(f"  Collecting {samples_needed} samples ({duration}s)...")
 
-    data      = stream.board.get_board_data()
-    eeg_ch    = stream.eeg_channels
-    c3_signal = data[eeg_ch[Config.C3_CHANNEL - 1]][-samples_needed:]
-    c4_signal = data[eeg_ch[Config.C4_CHANNEL - 1]][-samples_needed:]
+    c3_signal, c4_signal = collect_window_samples(stream, samples_needed)
     sample_count = len(c3_signal)
 
-    print(f"  Collected {sample_count} samples")
+    logger.info(f"  Collected {sample_count} samples")
 
     # Raw signal diagnostics
     c3_zeros = np.sum(c3_signal == 0)
     c4_zeros = np.sum(c4_signal == 0)
-    print(f"  [DEBUG IMAGERY] C3 raw  mean: {c3_signal.mean():.2f}  std: {c3_signal.std():.2f}  zeros: {c3_zeros}/{sample_count}")
-    print(f"  [DEBUG IMAGERY] C4 raw  mean: {c4_signal.mean():.2f}  std: {c4_signal.std():.2f}  zeros: {c4_zeros}/{sample_count}")
+    logger.info(f"  [DEBUG IMAGERY] C3 raw  mean: {c3_signal.mean():.2f}  std: {c3_signal.std():.2f}  zeros: {c3_zeros}/{sample_count}")
+    logger.info(f"  [DEBUG IMAGERY] C4 raw  mean: {c4_signal.mean():.2f}  std: {c4_signal.std():.2f}  zeros: {c4_zeros}/{sample_count}")
     if c3_zeros > sample_count * 0.2 or c4_zeros > sample_count * 0.2:
-        print("  WARNING: >20% zero samples - possible electrode dropout or buffer underrun")
+        logger.info("  WARNING: >20% zero samples - possible electrode dropout or buffer underrun")
     if c3_signal.std() < 0.5 or c4_signal.std() < 0.5:
-        print("  WARNING: Signal std very low - possible flat/saturated signal")
+        logger.info("  WARNING: Signal std very low - possible flat/saturated signal")
 
-    c3_filtered = processor.preprocess(c3_signal)
-    c4_filtered = processor.preprocess(c4_signal)
+    c3_filtered, c4_filtered = processor.preprocess(np.stack([c3_signal, c4_signal]))
 
-    c3_mu_power   = processor.compute_psd(c3_filtered, Config.MU_BAND)
-    c3_beta_power = processor.compute_psd(c3_filtered, Config.BETA_BAND)
-    c4_mu_power   = processor.compute_psd(c4_filtered, Config.MU_BAND)
-    c4_beta_power = processor.compute_psd(c4_filtered, Config.BETA_BAND)
+    c3_powers = processor.compute_psd_multi(c3_filtered, _BANDS)
+    c4_powers = processor.compute_psd_multi(c4_filtered, _BANDS)
+    c3_mu_power,  c3_beta_power = c3_powers['mu'], c3_powers['beta']
+    c4_mu_power,  c4_beta_power = c4_powers['mu'], c4_powers['beta']
 
     c3_mu_erd   = processor.compute_erd(c3_mu_power,   baseline['c3_mu_power'])
     c3_beta_erd = processor.compute_erd(c3_beta_power, baseline['c3_beta_power'])
     c4_mu_erd   = processor.compute_erd(c4_mu_power,   baseline['c4_mu_power'])
     c4_beta_erd = processor.compute_erd(c4_beta_power, baseline['c4_beta_power'])
 
-    print(f"  [DEBUG IMAGERY] C3  mu_pwr: {c3_mu_power:.2f}  beta_pwr: {c3_beta_power:.2f}"
+    logger.info(f"  [DEBUG IMAGERY] C3  mu_pwr: {c3_mu_power:.2f}  beta_pwr: {c3_beta_power:.2f}"
           f"  (baseline  mu: {baseline['c3_mu_power']:.2f}  beta: {baseline['c3_beta_power']:.2f})")
-    print(f"  [DEBUG IMAGERY] C4  mu_pwr: {c4_mu_power:.2f}  beta_pwr: {c4_beta_power:.2f}"
+    logger.info(f"  [DEBUG IMAGERY] C4  mu_pwr: {c4_mu_power:.2f}  beta_pwr: {c4_beta_power:.2f}"
           f"  (baseline  mu: {baseline['c4_mu_power']:.2f}  beta: {baseline['c4_beta_power']:.2f})")
 
     return {
@@ -610,44 +779,39 @@ def collect_trial_data(stream, processor, baseline):
 
 def collect_rest_trial_data(stream, processor, baseline):
     """Collect 1.8s of REST EEG (no motor imagery)."""
-    import time
-
     stream.clear_buffer()
     time.sleep(0.2)
 
     duration       = 1.8
-    samples_needed = int(duration * Config.SAMPLING_RATE)
-    print(f"  Collecting {samples_needed} samples ({duration}s)...")
-
-    time.sleep(duration)
+    samples_needed = int(duration * _SR)
+    logger.info(f"  Collecting {samples_needed} samples ({duration}s)...")
 
-    data      = stream.board.get_board_data()
-    eeg_ch    = stream.eeg_channels
-    c3_signal = data[eeg_ch[Config.C3_CHANNEL - 1]][-samples_needed:]
-    c4_signal = data[eeg_ch[Config.C4_CHANNEL - 1]][-samples_needed:]
+    c3_signal, c4_signal = collect_window_samples(stream, samples_needed)
     sample_count = len(c3_signal)
 
-    print(f"  Collected {sample_count} samples")
+    logger.info(f"  Collected {sample_count} samples")
 
     # Raw signal diagnostics
     c3_zeros = np.sum(c3_signal == 0)
     c4_zeros = np.sum(c4_signal == 0)
-    print(f"  [DEBUG REST]    C3 raw  mean: {c3_signal.mean():.2f}  std: {c3_signal.std():.2f}  zeros: {c3_zeros}/{sample_count}")
-    print(f"  [DEBUG REST]    C4 raw  mean: {c4_signal.mean():.2f}  std: {c4_signal.std():.2f}  zeros: {c4_zeros}/{sample_count}")
+    logger.info(f"  [DEBUG REST]    C3 raw  mean: {c3_signal.mean():.2f}  std: {c3_signal.std():.2f}  zeros: {c3_zeros}/{sample_count}")
+    logger.info(f"  [DEBUG REST]    C4 raw  mean: {c4_signal.mean():.2f}  std: {c4_signal.std():.2f}  zeros: {c4_zeros}/{sample_count}")
     if c3_zeros > sample_count * 0.2 or c4_zeros > sample_count * 0.2:
-        print("  WARNING: >20% zero samples - possible electrode dropout or buffer underrun")
+        logger.info("  WARNING: >20% zero samples - possible electrode dropout or buffer underrun")
     if c3_signal.std() < 0.5 or c4_signal.std() < 0.5:
-        print("  WARNING: Signal std very low - possible flat/saturated signal")
+        logger.info("  WARNING: Signal std very low - possible flat/saturated signal")
+
+    c3_f, c4_f = processor.preprocess(np.stack([c3_signal, c4_signal]))
 
-    c3_f = processor.preprocess(c3_signal)
-    c4_f = processor.preprocess(c4_signal)
+    c3_powers = processor.compute_psd_multi(c3_f, _BANDS)
+    c4_powers = processor.compute_psd_multi(c4_f, _BANDS)
 
-    c3_mu_erd   = processor.compute_erd(processor.compute_psd(c3_f, Config.MU_BAND),   baseline['c3_mu_power'])
-    c3_beta_erd = processor.compute_erd(processor.compute_psd(c3_f, Config.BETA_BAND), baseline['c3_beta_power'])
-    c4_mu_erd   = processor.compute_erd(processor.compute_psd(c4_f, Config.MU_BAND),   baseline['c4_mu_power'])
-    c4_beta_erd = processor.compute_erd(processor.compute_psd(c4_f, Config.BETA_BAND), baseline['c4_beta_power'])
+    c3_mu_erd   = processor.compute_erd(c3_powers['mu'],   baseline['c3_mu_power'])
+    c3_beta_erd = processor.compute_erd(c3_powers['beta'], baseline['c3_beta_power'])
+    c4_mu_erd   = processor.compute_erd(c4_powers['mu'],   baseline['c4_mu_power'])
+    c4_beta_erd = processor.compute_erd(c4_powers['beta'], baseline['c4_beta_power'])
 
-    print(f"  [DEBUG REST]    C3  mu_pwr: {processor.compute_psd(c3_f, Config.MU_BAND):.2f}  beta_pwr: {processor.compute_psd(c3_f, Config.BETA_BAND):.2f}"
+    logger.info(f"  [DEBUG REST]    C3  mu_pwr: {c3_powers['mu']:.2f}  beta_pwr: {c3_powers['beta']:.2f}"
           f"  (baseline  mu: {baseline['c3_mu_power']:.2f}  beta: {baseline['c3_beta_power']:.2f})")
 
     return {
@@ -679,37 +843,64 @@ def prepare_training_data(rest_trials, imagery_trials):
 
 def run_detection():
     """Run real-time detection in background"""
-    global detector, bci_state, baseline, classifier
+    global detector, baseline, classifier
     
     detector = RealTimeDetector(stream, processor, baseline, classifier)
     
-    print("\nStarting real-time detection...")
-    
-    # Modified detection loop that updates bci_state
-    while bci_state['status'] == 'detecting':
-        data = stream.get_data(1)
-        
+    logger.info("\nStarting real-time detection...")
+
+    # One batch per detection step, as in RealTimeDetector.run: the
+    # sliding PSD only changes when a full step-sized segment completes,
+    # so pulling smaller chunks would re-classify an identical window —
+    # stuffing the detection history with duplicate predictions and
+    # bumping the poll version for byte-identical ERD values.
+    batch_n = detector.step_size
+
+    # Modified detection loop that updates bci_state. Count-paced
+    # consuming reads: wait until a full batch is queued, then drain the
+    # board — a peeking get_current_board_data read on a fixed half-batch
+    # cadence would re-ingest part of every previous batch and skew the
+    # PSD with duplicated sample runs.
+    while not stop_event.is_set():
+        data = stream.wait_for_data(batch_n, stop=stop_event)
+
         if data.shape[1] > 0:
-            eeg_ch    = stream.eeg_channels
-            c3_sample = data[eeg_ch[Config.C3_CHANNEL - 1]][0]
-            c4_sample = data[eeg_ch[Config.C4_CHANNEL - 1]][0]
-            
-            detector.add_sample(c3_sample, c4_sample)
-            
-            # Process window
-            if len(detector.c3_buffer) == detector.window_size:
-                trigger, prediction, confidence, erd = detector.process_window()
-                
-                # Update state
-                bci_state['confidence'] = confidence
-                bci_state['erd_values'] = erd
-                
+            eeg_ch   = stream.eeg_channels
+            c3_chunk = data[eeg_ch[_C3_IDX]]
+            c4_chunk = data[eeg_ch[_C4_IDX]]
+
+            detector.add_samples(c3_chunk, c4_chunk)
+
+            trigger, prediction, confidence, erd_vec = detector.process_window()
+
+            if erd_vec is not None:
+                # Names and JSON-safe floats are attached only here, at
+                # the API edge — the detector hands back a bare 4-vector
+                erd = dict(zip(('c3_mu', 'c3_beta', 'c4_mu', 'c4_beta'),
+                               erd_vec.tolist()))
+
+                # One detection event, one snapshot: confidence, ERD and
+                # any trigger land in a single update_state call with the
+                # version bump, so a ?since poll can never see the new
+                # version with the trigger still unset
+                changes = {'confidence': float(confidence), 'erd_values': erd,
+                           'version': bci_state['version'] + 1}
                 if trigger:
-                    bci_state['trigger_detected'] = True
-                    bci_state['last_trigger_time'] = time.time()
-                    print(f"\nTRIGGER DETECTED - Confidence: {confidence:.0%}")
-        
-        time.sleep(1 / Config.SAMPLING_RATE)
+                    changes['trigger_detected'] = True
+                    changes['last_trigger_time'] = time.time()
+                update_state(**changes)
+
+                if trigger:
+                    logger.info(f"\nTRIGGER DETECTED - Confidence: {confidence:.0%}")
+
+                    # Push to Flutter immediately instead of waiting for the
+                    # next /detection/poll round trip.
+                    if sio is not None:
+                        sio.emit('mi_trigger', {
+                            'confidence': float(confidence),
+                            'erd': erd,
+                            'ts': bci_state['last_trigger_time'],
+                        })
 
 
 # ============================================================================
@@ -729,7 +920,23 @@ if __name__ == '__main__':
     print("  GET  /training/progress     - Get training progress")
     print("  POST /detection/start       - Start MI detection")
     print("  GET  /detection/poll        - Check for triggers")
+    print("  WS   mi_trigger event       - Trigger push (if flask-socketio installed)")
     print("  POST /system/shutdown       - Shutdown system")
     print("\n" + "="*60 + "\n")
-    
-    app.run(host='0.0.0.0', port=5000, debug=True, threaded=True)
\ No newline at end of file
+
+    # Werkzeug's debugger/reloader adds per-request overhead and respawns the
+    # process, double-starting the BCI threads — only enable it on request.
+    debug = bool(os.getenv('BCI_DEBUG'))
+
+    # In threading mode Socket.IO rides plain WSGI (long-polling), so the
+    # socketio-wrapped app can be served through waitress like any other
+    # Flask app. sio.run spins up Werkzeug's dev server, which newer
+    # flask-socketio refuses to start outside a dev TTY — keep it only as
+    # the explicit-debug fallback, with the override flag it requires.
+    if WAITRESS_AVAILABLE and not debug:
+        serve(app, host='0.0.0.0', port=5000, threads=8)
+    elif sio is not None:
+        sio.run(app, host='0.0.0.0', port=5000, debug=debug,
+                allow_unsafe_werkzeug=True)
+    else:
+        app.run(host='0.0.0.0', port=5000, debug=debug, threaded=True)
\ No newline at end of file
@@ -15,11 +15,13 @@ BEFORE RUNNING:
 """
 
 import numpy as np
-import pandas as pd
-from scipy.signal import welch, butter, sosfiltfilt
-import matplotlib.pyplot as plt
+from scipy.signal import (welch, butter, sosfiltfilt, sosfilt, sosfilt_zi,
+                          get_window, iirnotch, filtfilt)
+from scipy.fft import rfft, next_fast_len
 import time
-from collections import deque
+import threading
+import csv
+from concurrent.futures import ThreadPoolExecutor
 import json
 import pickle
 from datetime import datetime
@@ -31,11 +33,14 @@ warnings.filterwarnings('ignore')
 from brainflow.board_shim import BoardShim, BrainFlowInputParams, BoardIds
 from brainflow.data_filter import DataFilter, FilterTypes, DetrendOperations
 
-# MNE-Python for EEG processing
-import mne
-from mne.preprocessing import ICA
-
 # Machine Learning
+# Optional JIT (graceful fallback to plain NumPy if unavailable)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 from sklearn.discriminant_analysis import LinearDiscriminantAnalysis
 from sklearn.svm import SVC
 from sklearn.preprocessing import StandardScaler
@@ -130,6 +135,7 @@ class EEGStream:
         self.eeg_channels = BoardShim.get_eeg_channels(board_id)
         self.sampling_rate = BoardShim.get_sampling_rate(board_id)
         self.timestamp_channel = BoardShim.get_timestamp_channel(board_id)
+        self._n_rows = BoardShim.get_num_rows(board_id)
         
         print(f"\n{'='*60}")
         print(f"EEG Hardware Initialized")
@@ -173,14 +179,26 @@ class EEGStream:
 
         print("\nConfiguring Neuropawn Knight Board...")
 
-        for channel in range(1, num_channels + 1):
-            cmd_on = f"chon_{channel}_12"
-            self.board.config_board(cmd_on)
-            time.sleep(0.2)
+        chon_cmds = [f"chon_{ch}_12" for ch in range(1, num_channels + 1)]
+        rld_cmds = [f"rldadd_{ch}" for ch in range(1, num_channels + 1)]
 
-            cmd_rld = f"rldadd_{channel}"
-            self.board.config_board(cmd_rld)
+        # Preferred: one compound command per phase — a single USB round
+        # trip instead of one per channel. Firmware that rejects the
+        # separator raises, in which case we fall back to pipelined
+        # per-channel commands (config_board blocks on the board ACK, so
+        # no sleeps are needed between them; one short barrier separates
+        # the chon and rldadd phases).
+        try:
+            self.board.config_board(";".join(chon_cmds))
+            time.sleep(0.2)
+            self.board.config_board(";".join(rld_cmds))
+        except Exception as e:
+            print(f"Batched config not supported ({e}), sending per-channel...")
+            for cmd in chon_cmds:
+                self.board.config_board(cmd)
             time.sleep(0.2)
+            for cmd in rld_cmds:
+                self.board.config_board(cmd)
 
         print("Neuropawn configuration complete\n")
     
@@ -198,52 +216,244 @@ class EEGStream:
         Returns: numpy array [channels x samples]
         """
         if num_samples:
-            data = self.board.get_current_board_data(num_samples)
-        else:
-            data = self.board.get_board_data()
-        return data
+            return self.board.get_current_board_data(num_samples)
+        return self.board.get_board_data()
     
+    def wait_for_data(self, num_samples, poll_interval=0.002, stop=None):
+        """
+        Block until at least num_samples are queued, then drain the board
+        Returns: numpy array [rows x samples] (everything queued; empty
+        if the optional stop event is set while waiting)
+
+        Pacing comes from the board's own sample clock via
+        get_board_data_count, not from a fixed sleep — so wakeups align
+        with sample epochs instead of scheduler timer granularity.
+        """
+        while self.board.get_board_data_count() < num_samples:
+            if stop is not None and stop.is_set():
+                return np.empty((self._n_rows, 0))
+            time.sleep(poll_interval)
+        return self.board.get_board_data()
+
     def clear_buffer(self):
         """Clear the data buffer"""
         _ = self.board.get_board_data()
 
+    def start_ring_acquisition(self, ring, poll_interval=0.1):
+        """
+        Start a daemon thread that drains the board into a RingBuffer
+        every ~poll_interval seconds, so collection overlaps acquisition
+        instead of one multi-second bulk pull at the end.
+        Returns a threading.Event — set it to stop the thread.
+        """
+        stop = threading.Event()
+        eeg_rows = self.eeg_channels
+
+        def _acq_loop():
+            while not stop.is_set():
+                data = self.board.get_board_data()
+                if data.shape[1] > 0:
+                    ring.write(data[eeg_rows])
+                stop.wait(poll_interval)
+
+        threading.Thread(target=_acq_loop, daemon=True).start()
+        return stop
+
+
+class RingBuffer:
+    """Fixed-size circular buffer for multichannel EEG samples.
+
+    A producer thread writes incoming (channels, k) chunks; a consumer
+    waits until enough samples have arrived and copies them out. Backed
+    by one pre-allocated float32 array, so steady-state acquisition does
+    no allocation and overflow simply overwrites the oldest samples.
+    """
+
+    def __init__(self, n_channels, capacity):
+        self.buf = np.empty((n_channels, capacity), dtype=np.float32)
+        self.capacity = capacity
+        self.write_pos = 0
+        self.total_written = 0
+        self._cond = threading.Condition()
+
+    def write(self, chunk):
+        """Append a (channels, k) chunk, wrapping around when full"""
+        k = chunk.shape[1]
+        if k == 0:
+            return
+        with self._cond:
+            end = self.write_pos + k
+            if end <= self.capacity:
+                self.buf[:, self.write_pos:end] = chunk
+            else:
+                split = self.capacity - self.write_pos
+                self.buf[:, self.write_pos:] = chunk[:, :split]
+                self.buf[:, :end - self.capacity] = chunk[:, split:]
+            self.write_pos = end % self.capacity
+            self.total_written += k
+            self._cond.notify_all()
+
+    def wait_for_samples(self, n, timeout=None):
+        """Block until n samples have been written. False on timeout."""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while self.total_written < n:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def read_last(self, n):
+        """Copy out the most recent n samples as (channels, n)"""
+        with self._cond:
+            n = min(n, self.total_written, self.capacity)
+            start = (self.write_pos - n) % self.capacity
+            if start + n <= self.capacity:
+                return self.buf[:, start:start + n].copy()
+            split = self.capacity - start
+            out = np.empty((self.buf.shape[0], n), dtype=self.buf.dtype)
+            out[:, :split] = self.buf[:, start:]
+            out[:, split:] = self.buf[:, :n - split]
+            return out
+
 
 # ============================================================================
 # SIGNAL PROCESSING
 # ============================================================================
 
+def _erd_vec(powers, baseline):
+    """ERD% of band powers against baseline — works on scalars or the
+    4-element feature vector"""
+    return (powers - baseline) / baseline * 100.0
+
+
+if NUMBA_AVAILABLE:
+    _erd_vec = njit(cache=True, fastmath=True)(_erd_vec)
+    # Warm-up at import so the compile (or on-disk cache load) never
+    # lands inside the first real-time window
+    _erd_vec(np.ones(4, dtype=np.float32), np.ones(4, dtype=np.float32))
+
+
 class SignalProcessor:
     """Handles filtering, artifact removal, and feature extraction"""
     
     def __init__(self, sampling_rate=250):
         self.fs = sampling_rate
-        
-    def bandpass_filter(self, data, low=1.0, high=50.0):
-        """Apply Butterworth bandpass filter"""
-        sos = butter(4, [low, high], btype='band', fs=self.fs, output='sos')
+
+        # Filter coefficients are pure functions of (fs, band) — design
+        # them once instead of on every preprocess() call
+        # float32 coefficients keep the whole filter/PSD chain in FP32:
+        # the ADC is <=24 bits and every feature is a normalized ratio, so
+        # single precision loses nothing while halving memory traffic
+        self._sos = butter(4, [Config.BANDPASS_LOW, Config.BANDPASS_HIGH],
+                           btype='band', fs=self.fs,
+                           output='sos').astype(np.float32)
+        notch_b, notch_a = iirnotch(Config.NOTCH_FREQ, 30.0, self.fs)
+        self._notch_b = notch_b.astype(np.float32)
+        self._notch_a = notch_a.astype(np.float32)
+
+        # Pre-built Welch taper — scipy otherwise regenerates the Hann
+        # window on every PSD call. (The FFT itself is planned and cached
+        # per size inside scipy.fft's pocketfft backend.)
+        self._welch_window = get_window('hann', Config.WELCH_NPERSEG).astype(np.float32)
+
+        # The frequency grid for the standard segment size is fixed, so
+        # band masks collapse to precomputed slices (freqs is monotone);
+        # this matches welch's grid: rfftfreq(nperseg, 1/fs)
+        self._freqs = np.fft.rfftfreq(Config.WELCH_NPERSEG, 1.0 / self.fs)
+        # Band slices keyed by (grid length, band) — the Welch grid and
+        # the periodogram grid for each window length each get their own
+        self._band_slices = {}
+        for band in (Config.MU_BAND, Config.BETA_BAND):
+            key = (self._freqs.size, tuple(band))
+            self._band_slices[key] = self._band_slice(self._freqs, band)
+
+        # Per-length periodogram cache for fast_psd: window, density
+        # normalization, frequency grid and padded FFT length. Warmed for
+        # the step segment (what the sliding detector actually FFTs) and
+        # the full window (trial-sized blocks) so the first real-time
+        # call pays no setup cost.
+        self._psd_cache = {}
+        self._psd_entry(int(Config.STEP_SIZE * self.fs))
+        self._psd_entry(int(Config.WINDOW_DURATION * self.fs))
+
+    @staticmethod
+    def _band_slice(freqs, band):
+        """slice covering band[0] <= f <= band[1] on a monotone grid"""
+        lo = np.searchsorted(freqs, band[0])
+        hi = np.searchsorted(freqs, band[1], side='right')
+        return slice(lo, hi)
+
+    def _get_band_slice(self, freqs, band):
+        """Band slice cached per (grid length, band)"""
+        key = (freqs.size, tuple(band))
+        sl = self._band_slices.get(key)
+        if sl is None:
+            sl = self._band_slices[key] = self._band_slice(freqs, band)
+        return sl
+
+    # Above this many samples, Welch is computed block-wise: scipy builds
+    # the full 2-D segment matrix internally, so one 60 s baseline pull
+    # would otherwise allocate every overlapped segment at once
+    _MAX_WELCH_BLOCK = 4096
+
+    def _welch(self, data):
+        """Welch PSD reusing the cached window when the signal is long
+        enough for the standard segment size"""
+        if data.shape[-1] > self._MAX_WELCH_BLOCK:
+            return self.welch_blocked(data)
+        if data.shape[-1] >= Config.WELCH_NPERSEG:
+            return welch(data, fs=self.fs, window=self._welch_window,
+                         nperseg=Config.WELCH_NPERSEG)
+        return welch(data, fs=self.fs, nperseg=data.shape[-1])
+
+    def welch_blocked(self, data, block_samples=_MAX_WELCH_BLOCK):
+        """Welch PSD of a long signal, averaged over fixed-size blocks so
+        peak memory is bounded by one block's segment matrix instead of
+        the whole recording's"""
+        n = data.shape[-1]
+        freqs = None
+        psd_sum = None
+        count = 0
+        for start in range(0, n, block_samples):
+            block = data[..., start:start + block_samples]
+            if count and block.shape[-1] < Config.WELCH_NPERSEG:
+                break  # trailing sliver shorter than one segment
+            freqs, psd = welch(block, fs=self.fs, window=self._welch_window,
+                               nperseg=min(Config.WELCH_NPERSEG, block.shape[-1]))
+            psd_sum = psd if psd_sum is None else psd_sum + psd
+            count += 1
+        return freqs, psd_sum / count
+        
+    def bandpass_filter(self, data, low=Config.BANDPASS_LOW, high=Config.BANDPASS_HIGH):
+        """Apply Butterworth bandpass filter (filters along the last axis,
+        so a (channels, samples) block is processed in one call)"""
+        if (low, high) == (Config.BANDPASS_LOW, Config.BANDPASS_HIGH):
+            sos = self._sos
+        else:
+            sos = butter(4, [low, high], btype='band', fs=self.fs,
+                         output='sos').astype(np.float32)
         return sosfiltfilt(sos, data)
     
-    def notch_filter(self, data, freq=60.0, quality=30.0):
+    def notch_filter(self, data, freq=Config.NOTCH_FREQ, quality=30.0):
         """Remove power line noise using scipy instead of BrainFlow"""
-        from scipy.signal import iirnotch, filtfilt
-        
-        # Design notch filter
-        b, a = iirnotch(freq, quality, self.fs)
-        
-        # Apply filter
-        filtered = filtfilt(b, a, data)
-        return filtered
+        if (freq, quality) == (Config.NOTCH_FREQ, 30.0):
+            b, a = self._notch_b, self._notch_a
+        else:
+            b, a = iirnotch(freq, quality, self.fs)
+        return filtfilt(b, a, data)
     
     def preprocess(self, data, apply_notch=True):
         """
         Apply standard preprocessing pipeline
         Args:
-            data: 1D array of EEG samples
+            data: 1D array of EEG samples, or 2D (channels, samples)
         Returns:
-            Filtered data
+            Filtered data (same shape)
         """
-        # Convert to numpy array and ensure float type
-        data = np.array(data, dtype=np.float64)
+        # Convert to numpy array; float32 end-to-end (see __init__)
+        data = np.asarray(data, dtype=np.float32)
         
         # Bandpass filter
         filtered = self.bandpass_filter(data, Config.BANDPASS_LOW, Config.BANDPASS_HIGH)
@@ -267,20 +477,130 @@ class SignalProcessor:
             If band specified: band power (scalar)
             If no band: (frequencies, psd) arrays
         """
-        freqs, psd = welch(data, fs=self.fs, nperseg=Config.WELCH_NPERSEG)
+        freqs, psd = self._welch(data)
         
         if band:
-            # Extract specific band power
-            band_idx = np.logical_and(freqs >= band[0], freqs <= band[1])
-            # Use trapezoid for numpy 2.0+, fallback to trapz for older versions
-            try:
-                band_power = np.trapezoid(psd[band_idx], freqs[band_idx])
-            except AttributeError:
-                band_power = np.trapz(psd[band_idx], freqs[band_idx])
-            return band_power
+            # Extract specific band power. Welch's frequency grid is
+            # uniform, so sum*df matches trapezoid up to endpoint halving
+            # — irrelevant for the ratio-based ERD features — and is a
+            # single SIMD reduction instead of per-bin mul-adds.
+            df = freqs[1] - freqs[0]
+            return psd[self._get_band_slice(freqs, band)].sum() * df
         else:
             return freqs, psd
     
+    def compute_psd_multi(self, data, bands):
+        """
+        Compute several band powers from a single Welch PSD
+        Args:
+            data: 1D array of EEG samples
+            bands: dict mapping name -> (low, high) tuple
+        Returns:
+            dict mapping name -> band power
+        """
+        freqs, psd = self._welch(data)
+
+        df = freqs[1] - freqs[0]
+        powers = {}
+        for name, band in bands.items():
+            powers[name] = psd[self._get_band_slice(freqs, band)].sum() * df
+        return powers
+
+    def streaming_filter_state(self, first_sample=0.0):
+        """Initial bandpass state for filter_streaming, seeded so the
+        filter starts at the signal's DC level instead of ringing from 0"""
+        return sosfilt_zi(self._sos).astype(np.float32) * first_sample
+
+    def filter_streaming(self, chunk, zi):
+        """
+        Causal bandpass over one chunk with persistent state
+        Args:
+            chunk: 1D array of new samples
+            zi: filter state from streaming_filter_state / previous call
+        Returns:
+            (filtered chunk, updated state)
+
+        Half the FLOPs of sosfiltfilt (single pass, no backward run) and
+        each real-time step filters only the new samples rather than
+        re-filtering the whole window. Offline paths (baseline, training)
+        keep zero-phase sosfiltfilt via preprocess().
+        """
+        return sosfilt(self._sos, chunk, zi=zi)
+
+    def compute_band_powers(self, data, bands):
+        """
+        Band powers for a stacked (channels, samples) block from a single
+        batched Welch call (welch runs along axis=-1, so both channels are
+        segmented, windowed and transformed together)
+        Args:
+            data: 2D array (channels, samples)
+            bands: sequence of (low, high) tuples
+        Returns:
+            (channels, len(bands)) array of band powers
+        """
+        freqs, psd = self._welch(data)
+
+        df = freqs[1] - freqs[0]
+        powers = np.empty((psd.shape[0], len(bands)), dtype=np.float32)
+        for j, band in enumerate(bands):
+            sl = self._get_band_slice(freqs, band)
+            powers[:, j] = psd[:, sl].sum(axis=-1) * df
+        return powers
+
+    def _psd_entry(self, n):
+        """Cached (window, norm, freqs, nfft) for an n-sample periodogram"""
+        cached = self._psd_cache.get(n)
+        if cached is None:
+            win = get_window('hann', n).astype(np.float32)
+            norm = (win * win).sum() * self.fs
+            # Pad to the next fast composite length so pocketfft takes
+            # its small-radix path regardless of the window duration
+            nfft = next_fast_len(n)
+            freqs = np.fft.rfftfreq(nfft, 1.0 / self.fs)
+            cached = self._psd_cache[n] = (win, norm, freqs, nfft)
+        return cached
+
+    def fast_psd(self, data):
+        """
+        Single-segment one-sided periodogram with a cached Hann window
+        Args:
+            data: 1D or 2D (channels, samples) array
+        Returns:
+            (freqs, psd) matching welch's density scaling
+
+        For the 2 s real-time window there is only one segment anyway, so
+        welch's segmentation/detrend bookkeeping is pure overhead — this
+        is one rfft plus a scale. scipy.fft.rfft keeps float32 input in
+        single precision (numpy's FFT would silently upcast to double).
+        """
+        n = data.shape[-1]
+        win, norm, freqs, nfft = self._psd_entry(n)
+
+        X = rfft(data * win, n=nfft)
+        psd = (X.real ** 2 + X.imag ** 2) / norm
+        # One-sided density: double all bins except DC (and Nyquist when
+        # the padded length is even)
+        if nfft % 2:
+            psd[..., 1:] *= 2.0
+        else:
+            psd[..., 1:-1] *= 2.0
+        return freqs, psd
+
+    def band_powers_from_psd(self, freqs, psd, bands):
+        """Band integration of an already-computed (channels, bins) PSD"""
+        df = freqs[1] - freqs[0]
+        powers = np.empty((psd.shape[0], len(bands)), dtype=np.float32)
+        for j, band in enumerate(bands):
+            sl = self._get_band_slice(freqs, band)
+            powers[:, j] = psd[:, sl].sum(axis=-1) * df
+        return powers
+
+    def fast_band_powers(self, data, bands):
+        """compute_band_powers via the single-segment periodogram —
+        the real-time counterpart for window-sized blocks"""
+        freqs, psd = self.fast_psd(np.atleast_2d(data))
+        return self.band_powers_from_psd(freqs, psd, bands)
+
     def compute_erd(self, activation_power, baseline_power):
         """
         Calculate Event-Related Desynchronization
@@ -288,13 +608,75 @@ class SignalProcessor:
         
         Negative values indicate desynchronization (expected during MI)
         """
-        return ((activation_power - baseline_power) / baseline_power) * 100
+        return _erd_vec(activation_power, baseline_power)
+
+
+class SlidingWelch:
+    """Incremental Welch PSD over a sliding window.
+
+    Per-segment periodograms live in a ring: each detection step FFTs
+    only the newest step-sized segment and evicts the oldest, so the
+    per-step FFT cost is O(segment) instead of O(window) even at high
+    window overlap. Segments are tapered but non-overlapping, trading a
+    little estimator variance for the incremental update.
+    """
+
+    def __init__(self, processor, n_channels, segment_samples, n_segments):
+        self.processor = processor
+        self.seg_len = segment_samples
+        self.n_segments = n_segments
+        self._stage = np.empty((n_channels, segment_samples), dtype=np.float32)
+        self._fill = 0
+        self.freqs = None
+        self._ring = None       # (n_segments, channels, bins), lazily sized
+        self._idx = 0
+        self._count = 0
+
+    def extend(self, chunk):
+        """Feed a (channels, n) chunk; FFTs fire as segments complete"""
+        n = chunk.shape[-1]
+        pos = 0
+        while pos < n:
+            take = min(self.seg_len - self._fill, n - pos)
+            self._stage[:, self._fill:self._fill + take] = chunk[:, pos:pos + take]
+            self._fill += take
+            pos += take
+            if self._fill == self.seg_len:
+                self._push(self._stage)
+                self._fill = 0
+
+    def _push(self, segment):
+        freqs, psd = self.processor.fast_psd(segment)
+        if self._ring is None:
+            self.freqs = freqs
+            self._ring = np.empty((self.n_segments,) + psd.shape,
+                                  dtype=psd.dtype)
+        self._ring[self._idx] = psd
+        self._idx = (self._idx + 1) % self.n_segments
+        self._count = min(self._count + 1, self.n_segments)
+
+    @property
+    def full(self):
+        return self._count == self.n_segments
+
+    def psd(self):
+        """(freqs, averaged PSD) over the segments currently in the ring"""
+        return self.freqs, self._ring[:self._count].mean(axis=0)
 
 
 # ============================================================================
 # BASELINE CALIBRATION
 # ============================================================================
 
+def baseline_array(baseline):
+    """(channel, band) float32 view of a baseline dict — row 0 = C3,
+    row 1 = C4; column 0 = mu, column 1 = beta. C-contiguous, so it
+    ravels straight into the feature order used everywhere else."""
+    return np.array([[baseline['c3_mu_power'], baseline['c3_beta_power']],
+                     [baseline['c4_mu_power'], baseline['c4_beta_power']]],
+                    dtype=np.float32)
+
+
 class BaselineCalibrator:
     """Collects resting state baseline for ERD calculation"""
     
@@ -302,6 +684,7 @@ class BaselineCalibrator:
         self.stream = stream
         self.processor = processor
         self.baseline = None
+        self.baseline_arr = None
     
     def collect(self, duration=60):
         """
@@ -331,28 +714,42 @@ class BaselineCalibrator:
         time.sleep(1)
         print("\n>>> COLLECTING BASELINE - STAY RELAXED <<<")
         
-        # Clear buffer and collect fresh data
+        # Producer thread drains the board into a pre-allocated ring
+        # buffer every ~100ms while we wait — no multi-second stall on one
+        # bulk pull, and BrainFlow's internal buffer can't silently overflow.
+        samples_needed = int(duration * Config.SAMPLING_RATE)
+        ring = RingBuffer(len(self.stream.eeg_channels), samples_needed)
+
         self.stream.clear_buffer()
-        time.sleep(duration)
-        
-        # Get data
-        data = self.stream.get_data()
-        c3_data = data[Config.C3_CHANNEL]
-        c4_data = data[Config.C4_CHANNEL]
-        
-        # Preprocess
-        c3_clean = self.processor.preprocess(c3_data)
-        c4_clean = self.processor.preprocess(c4_data)
-        
-        # Calculate baseline power
+        acq_stop = self.stream.start_ring_acquisition(ring)
+        try:
+            ring.wait_for_samples(samples_needed, timeout=duration + 10)
+        finally:
+            acq_stop.set()
+
+        # Ring rows are EEG channels in order, so electrode N is row N-1
+        data = ring.read_last(samples_needed)
+        c3_data = data[Config.C3_CHANNEL - 1]
+        c4_data = data[Config.C4_CHANNEL - 1]
+        
+        # Preprocess both channels in one filter pass
+        clean = self.processor.preprocess(np.stack([c3_data, c4_data]))
+        
+        # Calculate baseline power — one batched PSD over both channels
+        powers = self.processor.compute_band_powers(
+            clean, (Config.MU_BAND, Config.BETA_BAND))
+        # Plain Python floats: the dict feeds json.dump, and np.float32
+        # scalars are not JSON serializable
         baseline = {
-            'c3_mu_power': self.processor.compute_psd(c3_clean, Config.MU_BAND),
-            'c3_beta_power': self.processor.compute_psd(c3_clean, Config.BETA_BAND),
-            'c4_mu_power': self.processor.compute_psd(c4_clean, Config.MU_BAND),
-            'c4_beta_power': self.processor.compute_psd(c4_clean, Config.BETA_BAND),
+            'c3_mu_power': float(powers[0, 0]),
+            'c3_beta_power': float(powers[0, 1]),
+            'c4_mu_power': float(powers[1, 0]),
+            'c4_beta_power': float(powers[1, 1]),
         }
         
         self.baseline = baseline
+        # SoA form for the vectorized ERD path (dict stays for JSON logs)
+        self.baseline_arr = np.ascontiguousarray(powers, dtype=np.float32)
         
         print("\nBASELINE COMPLETE")
         print(f"  C3 - Mu: {baseline['c3_mu_power']:.2f} µV²/Hz, Beta: {baseline['c3_beta_power']:.2f} µV²/Hz")
@@ -380,7 +777,23 @@ class TrainingCollector:
         self.stream = stream
         self.processor = processor
         self.baseline = baseline
+        # Baseline as a 4-vector in feature order, so per-window ERD is one
+        # vectorized expression instead of four scalar compute_erd calls
+        self.baseline_vec = baseline_array(baseline).ravel()
         self.training_data = []
+        # Feature matrix filled in place during collection — C-contiguous
+        # FP32 ready for sklearn, no list temporary or dtype inference
+        n_total = 2 * Config.TRAINING_TRIALS
+        self.X = np.empty((n_total, 4), dtype=np.float32)
+        self.y = np.empty(n_total, dtype=np.int8)
+        self._n = 0
+        # Feature extraction for trial N runs on this worker during trial
+        # N's rest period, so filtering + PSD never add to wall time. A
+        # separate process would need shared memory for the sample block
+        # and can't share the board handle; scipy's filters and FFTs
+        # release the GIL, so one thread gives the same overlap.
+        self._feature_pool = ThreadPoolExecutor(max_workers=1)
+        self._pending = []
     
     def collect_trial(self, label, trial_num, total_trials):
         """
@@ -408,28 +821,25 @@ class TrainingCollector:
             time.sleep(1)
         print("GO!\n")
         
-        # Collect data
+        # Collect data through the same producer/consumer ring as baseline
+        samples_needed = int(Config.TRIAL_DURATION * Config.SAMPLING_RATE)
+        ring = RingBuffer(len(self.stream.eeg_channels), samples_needed)
+
         self.stream.clear_buffer()
-        time.sleep(Config.TRIAL_DURATION)
-        
-        data = self.stream.get_data()
-        c3_data = data[Config.C3_CHANNEL]
-        c4_data = data[Config.C4_CHANNEL]
-        
-        # Preprocess
-        c3_clean = self.processor.preprocess(c3_data)
-        c4_clean = self.processor.preprocess(c4_data)
-        
-        # Extract features
-        features = self._extract_features(c3_clean, c4_clean)
+        acq_stop = self.stream.start_ring_acquisition(ring)
+        try:
+            ring.wait_for_samples(samples_needed, timeout=Config.TRIAL_DURATION + 5)
+        finally:
+            acq_stop.set()
+
+        data = ring.read_last(samples_needed)
+        c3_data = data[Config.C3_CHANNEL - 1].copy()
+        c4_data = data[Config.C4_CHANNEL - 1].copy()
         
-        # Store trial
-        self.training_data.append({
-            'features': features,
-            'label': label,
-            'trial_num': trial_num,
-            'timestamp': time.time()
-        })
+        # Hand preprocessing + feature extraction to the worker; it
+        # overlaps with the rest sleep below instead of delaying it
+        self._pending.append(self._feature_pool.submit(
+            self._process_trial, c3_data, c4_data, label, trial_num))
         
         print(" Trial complete")
         
@@ -438,6 +848,27 @@ class TrainingCollector:
             print(f"\nRest for {Config.REST_DURATION} seconds...")
             time.sleep(Config.REST_DURATION)
     
+    def _process_trial(self, c3_data, c4_data, label, trial_num):
+        """Preprocess and featurize one trial (runs on the worker)"""
+        clean = self.processor.preprocess(np.stack([c3_data, c4_data]))
+        return {
+            'features': self._extract_features(clean[0], clean[1]),
+            'label': label,
+            'trial_num': trial_num,
+            'timestamp': time.time()
+        }
+    
+    def drain_pending(self):
+        """Wait for in-flight trials and append them in capture order"""
+        for future in self._pending:
+            trial = future.result()
+            if self._n < self.X.shape[0]:
+                self.X[self._n] = trial['features']
+                self.y[self._n] = trial['label']
+                self._n += 1
+            self.training_data.append(trial)
+        self._pending.clear()
+    
     def _extract_features(self, c3_data, c4_data):
         """
         Extract features for classification
@@ -445,19 +876,13 @@ class TrainingCollector:
         Current implementation: ERD values for mu/beta bands
         Returns: 4-element feature vector [C3_mu_ERD, C3_beta_ERD, C4_mu_ERD, C4_beta_ERD]
         """
-        # Compute current band powers
-        c3_mu_power = self.processor.compute_psd(c3_data, Config.MU_BAND)
-        c3_beta_power = self.processor.compute_psd(c3_data, Config.BETA_BAND)
-        c4_mu_power = self.processor.compute_psd(c4_data, Config.MU_BAND)
-        c4_beta_power = self.processor.compute_psd(c4_data, Config.BETA_BAND)
-        
-        # Calculate ERD
-        c3_mu_erd = self.processor.compute_erd(c3_mu_power, self.baseline['c3_mu_power'])
-        c3_beta_erd = self.processor.compute_erd(c3_beta_power, self.baseline['c3_beta_power'])
-        c4_mu_erd = self.processor.compute_erd(c4_mu_power, self.baseline['c4_mu_power'])
-        c4_beta_erd = self.processor.compute_erd(c4_beta_power, self.baseline['c4_beta_power'])
+        # Compute current band powers — one batched PSD over both channels;
+        # (2, 2) ravels to [c3_mu, c3_beta, c4_mu, c4_beta]
+        powers = self.processor.compute_band_powers(
+            np.stack([c3_data, c4_data]), (Config.MU_BAND, Config.BETA_BAND)).ravel()
         
-        return np.array([c3_mu_erd, c3_beta_erd, c4_mu_erd, c4_beta_erd])
+        # ERD% for all four bands in one (JIT-able) vector expression
+        return _erd_vec(powers.astype(np.float32), self.baseline_vec)
     
     def collect_full_training_set(self):
         """
@@ -500,41 +925,74 @@ class TrainingCollector:
         for i in range(Config.TRAINING_TRIALS):
             self.collect_trial(label=1, trial_num=i+1, total_trials=Config.TRAINING_TRIALS)
         
+        self.drain_pending()
+        
         print(f"\n{'='*60}")
         print("✓ TRAINING DATA COLLECTION COMPLETE!")
         print(f"{'='*60}")
         print(f"Collected {len(self.training_data)} trials")
         
-        return self.training_data
+        return self.X[:self._n], self.y[:self._n]
 
 
 # ============================================================================
 # MACHINE LEARNING CLASSIFIER
 # ============================================================================
 
+def _lda4(x, w, b):
+    """Decision value for the fixed 4-feature LDA: unrolled dot + bias.
+
+    The feature length is always 4 here, so the dot product is written
+    out explicitly — with numba this compiles to a handful of fused
+    multiply-adds with no loop or shape checks.
+    """
+    return x[0] * w[0] + x[1] * w[1] + x[2] * w[2] + x[3] * w[3] + b
+
+
+if NUMBA_AVAILABLE:
+    _lda4 = njit(cache=True, fastmath=True)(_lda4)
+    _lda4(np.ones(4, dtype=np.float32), np.ones(4, dtype=np.float32), 0.0)
+
+
 class MIClassifier:
     """Trains and applies ML classifier for motor imagery detection"""
     
+    # Sigmoid lookup covers decision values in [-10, 10]; outside that
+    # range the sigmoid is saturated to 5 decimal places anyway
+    _LUT_SIZE = 4096
+    _LUT_SCALE = (_LUT_SIZE - 1) / 20.0
+
     def __init__(self):
         self.classifier = None
         self.scaler = StandardScaler()
         self.is_trained = False
         self.feature_names = ['C3_mu_ERD', 'C3_beta_ERD', 'C4_mu_ERD', 'C4_beta_ERD']
+        self._sig_lut = None
+        # Scaler folded into the linear decision (LDA only): d = w@x + b
+        self._w = None
+        self._b = 0.0
     
-    def train(self, training_data):
+    def train(self, training_data, y=None):
         """
         Train classifier on collected data
         
         Args:
-            training_data: list of dicts with 'features' and 'label'
+            training_data: (N, 4) feature matrix (with labels in y), or
+                the legacy list of dicts with 'features' and 'label'
+            y: label vector when training_data is a matrix
         """
         print(f"\n{'='*60}")
         print("TRAINING CLASSIFIER")
         print(f"{'='*60}")
         
         # Prepare data
-        X = np.array([trial['features'] for trial in training_data])
-        y = np.array([trial['label'] for trial in training_data])
+        if y is not None:
+            X = np.ascontiguousarray(training_data, dtype=np.float32)
+            y = np.asarray(y)
+        else:
+            X = np.array([trial['features'] for trial in training_data],
+                         dtype=np.float32)
+            y = np.array([trial['label'] for trial in training_data])
         
         print(f"Training samples: {len(X)}")
         print(f"  REST (class 0): {np.sum(y == 0)}")
@@ -553,7 +1011,10 @@ class MIClassifier:
         
         # Cross-validation
         print("\nPerforming 5-fold cross-validation...")
-        cv_scores = cross_val_score(self.classifier, X_scaled, y, cv=5, scoring='accuracy')
+        # n_jobs=-1: folds are independent fits, so let joblib use all
+        # cores (loky workers, so no fork trouble on any platform)
+        cv_scores = cross_val_score(self.classifier, X_scaled, y, cv=5,
+                                    scoring='accuracy', n_jobs=-1)
         print(f"CV Accuracy: {cv_scores.mean():.2%} ± {cv_scores.std():.2%}")
         
         # Train on full dataset
@@ -568,6 +1029,21 @@ class MIClassifier:
             for name, imp in sorted(zip(self.feature_names, importance), key=lambda x: x[1], reverse=True):
                 print(f"  {name}: {imp:.3f}")
         
+        # The scaler and LDA are both linear, so (x-mean)/scale followed
+        # by coef@x + intercept collapses into one fused dot product on
+        # the raw features — predict() never touches the scaler again.
+        # The sigmoid LUT is only valid here too: for a linear model the
+        # logistic of the margin is the model's own posterior, while an
+        # RBF SVM's margin is uncalibrated and must keep going through
+        # the Platt-scaled predict_proba.
+        if hasattr(self.classifier, 'coef_'):
+            self._sig_lut = (1.0 / (1.0 + np.exp(-np.linspace(
+                -10.0, 10.0, self._LUT_SIZE)))).astype(np.float32)
+            coef = self.classifier.coef_[0]
+            self._w = (coef / self.scaler.scale_).astype(np.float32)
+            self._b = float(self.classifier.intercept_[0]
+                            - np.dot(coef, self.scaler.mean_ / self.scaler.scale_))
+        
         self.is_trained = True
         print("\nClassifier trained successfully!")
         
@@ -576,12 +1052,14 @@ class MIClassifier:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             model_path = f"{Config.LOG_DIR}/classifier_{timestamp}.pkl"
             with open(model_path, 'wb') as f:
+                # Protocol 5 serializes the fitted numpy arrays as raw
+                # out-of-band buffers — smaller files, faster round-trip
                 pickle.dump({
                     'classifier': self.classifier,
                     'scaler': self.scaler,
                     'feature_names': self.feature_names,
                     'cv_scores': cv_scores
-                }, f)
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
             print(f"  Model saved to: {model_path}")
     
     def predict(self, features):
@@ -597,6 +1075,9 @@ class MIClassifier:
         if not self.is_trained:
             raise ValueError("Classifier not trained yet!")
         
+        if self._w is not None:
+            return self.predict_fast(features)
+        
         # Scale features
         features_scaled = self.scaler.transform(features.reshape(1, -1))
         
@@ -607,16 +1088,27 @@ class MIClassifier:
         if hasattr(self.classifier, 'predict_proba'):
             proba = self.classifier.predict_proba(features_scaled)[0]
             confidence = proba[prediction]
-        elif hasattr(self.classifier, 'decision_function'):
-            decision = self.classifier.decision_function(features_scaled)[0]
-            confidence = 1 / (1 + np.exp(-decision))  # Sigmoid
-            if prediction == 0:
-                confidence = 1 - confidence
         else:
             confidence = 1.0
         
         return prediction, confidence
     
+    def predict_fast(self, features):
+        """
+        predict() with every guard stripped: assumes a trained linear
+        model with fused weights (sign of the decision gives the class,
+        the sigmoid table the confidence). The real-time detector binds
+        this directly so each window costs a 4-element dot product, a
+        table lookup and two compares.
+        """
+        decision = float(_lda4(features, self._w, self._b))
+        prediction = int(decision > 0)
+        idx = int((decision + 10.0) * self._LUT_SCALE)
+        confidence = float(self._sig_lut[min(max(idx, 0), self._LUT_SIZE - 1)])
+        if prediction == 0:
+            confidence = 1.0 - confidence
+        return prediction, confidence
+
     def load_model(self, filepath):
         """Load pre-trained model"""
         with open(filepath, 'rb') as f:
@@ -624,6 +1116,15 @@ class MIClassifier:
         self.classifier = data['classifier']
         self.scaler = data['scaler']
         self.feature_names = data['feature_names']
+        # Fused weights and the sigmoid LUT only apply to linear models;
+        # an SVM keeps its Platt-calibrated predict_proba
+        if hasattr(self.classifier, 'coef_'):
+            self._sig_lut = (1.0 / (1.0 + np.exp(-np.linspace(
+                -10.0, 10.0, self._LUT_SIZE)))).astype(np.float32)
+            coef = self.classifier.coef_[0]
+            self._w = (coef / self.scaler.scale_).astype(np.float32)
+            self._b = float(self.classifier.intercept_[0]
+                            - np.dot(coef, self.scaler.mean_ / self.scaler.scale_))
         self.is_trained = True
         print(f"Model loaded from {filepath}")
 
@@ -640,65 +1141,95 @@ class RealTimeDetector:
         self.processor = processor
         self.baseline = baseline
         self.classifier = classifier
+        # Baseline in feature order for the vectorized ERD expression
+        self._baseline_vec = baseline_array(baseline).ravel()
+        # Bind the guard-free linear path when the classifier has fused
+        # weights (LDA); kernelized models keep the full predict()
+        self._predict = (classifier.predict_fast
+                         if getattr(classifier, '_w', None) is not None
+                         else classifier.predict)
         
         # Sliding window buffers
         self.window_size = int(Config.WINDOW_DURATION * Config.SAMPLING_RATE)
         self.step_size = int(Config.STEP_SIZE * Config.SAMPLING_RATE)
         
-        self.c3_buffer = deque(maxlen=self.window_size)
-        self.c4_buffer = deque(maxlen=self.window_size)
+        # Incremental Welch estimator over the sliding window: one
+        # step-sized FFT per step instead of re-transforming the whole
+        # overlapped window (row 0 = C3, row 1 = C4)
+        self._sliding = SlidingWelch(processor, 2, self.step_size,
+                                     max(1, self.window_size // self.step_size))
         
-        # Detection state
-        self.detection_history = deque(maxlen=Config.CONFIDENCE_WINDOWS)
+        # Detection state — last CONFIDENCE_WINDOWS predictions as a
+        # rolling bitmask; "all ones" is a single integer compare
+        self._hist = 0
+        self._hist_mask = (1 << Config.CONFIDENCE_WINDOWS) - 1
         self.last_trigger_time = 0
         self.is_mi_active = False
-    
+        # Rate limit for the status line (console flushes are syscalls)
+        self._last_print = 0.0
+
+        # Streaming bandpass — incoming samples are filtered once with
+        # persistent per-channel state held here; the filter itself lives
+        # in SignalProcessor so coefficients stay in one place.
+        self._c3_zi = None
+        self._c4_zi = None
+
+    def _filter_incoming(self, c3_chunk, c4_chunk):
+        """Run the streaming bandpass over an incoming chunk.
+
+        Filter state carries across calls, so each sample costs O(1)
+        instead of re-filtering the whole window every step.
+        """
+        c3_chunk = np.asarray(c3_chunk, dtype=np.float32)
+        c4_chunk = np.asarray(c4_chunk, dtype=np.float32)
+
+        if self._c3_zi is None:
+            self._c3_zi = self.processor.streaming_filter_state(c3_chunk[0])
+            self._c4_zi = self.processor.streaming_filter_state(c4_chunk[0])
+
+        c3_f, self._c3_zi = self.processor.filter_streaming(c3_chunk, self._c3_zi)
+        c4_f, self._c4_zi = self.processor.filter_streaming(c4_chunk, self._c4_zi)
+        return c3_f, c4_f
+
     def add_sample(self, c3_sample, c4_sample):
-        """Add new sample to sliding window buffers"""
-        self.c3_buffer.append(c3_sample)
-        self.c4_buffer.append(c4_sample)
+        """Filter and add a new sample to the sliding window"""
+        self.add_samples([c3_sample], [c4_sample])
+
+    def add_samples(self, c3_samples, c4_samples):
+        """Filter and add a whole chunk to the sliding window"""
+        c3_f, c4_f = self._filter_incoming(c3_samples, c4_samples)
+        self._sliding.extend(np.stack([c3_f, c4_f]))
     
     def process_window(self):
         """
         Process current window and detect motor imagery
         
         Returns:
-            trigger (bool), prediction (0/1), confidence (0-1), erd_values (dict)
+            trigger (bool), prediction (0/1), confidence (0-1),
+            erd (float32 array [c3_mu, c3_beta, c4_mu, c4_beta], or None
+            while the window is still filling)
         """
-        if len(self.c3_buffer) < self.window_size:
-            return False, 0, 0.0, {}
-        
-        # Get window data
-        c3_data = np.array(self.c3_buffer)
-        c4_data = np.array(self.c4_buffer)
-        
-        # Preprocess
-        c3_clean = self.processor.preprocess(c3_data)
-        c4_clean = self.processor.preprocess(c4_data)
-        
-        # Extract features (same as training)
-        c3_mu_power = self.processor.compute_psd(c3_clean, Config.MU_BAND)
-        c3_beta_power = self.processor.compute_psd(c3_clean, Config.BETA_BAND)
-        c4_mu_power = self.processor.compute_psd(c4_clean, Config.MU_BAND)
-        c4_beta_power = self.processor.compute_psd(c4_clean, Config.BETA_BAND)
-        
-        c3_mu_erd = self.processor.compute_erd(c3_mu_power, self.baseline['c3_mu_power'])
-        c3_beta_erd = self.processor.compute_erd(c3_beta_power, self.baseline['c3_beta_power'])
-        c4_mu_erd = self.processor.compute_erd(c4_mu_power, self.baseline['c4_mu_power'])
-        c4_beta_erd = self.processor.compute_erd(c4_beta_power, self.baseline['c4_beta_power'])
+        if not self._sliding.full:
+            return False, 0, 0.0, None
         
-        features = np.array([c3_mu_erd, c3_beta_erd, c4_mu_erd, c4_beta_erd])
+        # Welch PSD from the per-segment ring — only the newest segment
+        # was FFT'd this step, everything else is cached; the samples were
+        # already bandpassed by the streaming filter on ingest
+        freqs, psd = self._sliding.psd()
+        powers = self.processor.band_powers_from_psd(
+            freqs, psd, (Config.MU_BAND, Config.BETA_BAND)).ravel()
+        features = _erd_vec(powers, self._baseline_vec)
         
         # Classify
-        prediction, confidence = self.classifier.predict(features)
+        prediction, confidence = self._predict(features)
         
         # Update detection history
-        self.detection_history.append(prediction == 1)
+        self._hist = ((self._hist << 1) | int(prediction == 1)) & self._hist_mask
         
-        # Check for trigger
+        # Check for trigger — mask full of ones means CONFIDENCE_WINDOWS
+        # consecutive MI predictions
         trigger = False
-        confidence_met = (len(self.detection_history) == Config.CONFIDENCE_WINDOWS and
-                         sum(self.detection_history) == Config.CONFIDENCE_WINDOWS)
+        confidence_met = self._hist == self._hist_mask
         
         if confidence_met and not self.is_mi_active:
             current_time = time.time()
@@ -711,14 +1242,9 @@ class RealTimeDetector:
         if prediction == 0:
             self.is_mi_active = False
         
-        erd_values = {
-            'c3_mu': c3_mu_erd,
-            'c3_beta': c3_beta_erd,
-            'c4_mu': c4_mu_erd,
-            'c4_beta': c4_beta_erd
-        }
-        
-        return trigger, prediction, confidence, erd_values
+        # Features double as the ERD report — names are attached only at
+        # the logging/API edge, not on the hot path
+        return trigger, prediction, confidence, features
     
     def run(self, bt_controller=None):
         """
@@ -735,74 +1261,104 @@ class RealTimeDetector:
         print(f"  - Cooldown: {Config.TRIGGER_COOLDOWN}s between triggers")
         print("\nPress Ctrl+C to stop\n")
         
-        # Logging setup
-        log_data = []
+        # Logging setup — append one CSV row per window as it happens:
+        # O(1) memory over arbitrarily long sessions and nothing is lost
+        # on a crash, unlike the old list-of-dicts written at exit
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         log_file = f"{Config.LOG_DIR}/realtime_{timestamp}.csv"
+        log_fh = open(log_file, 'w', newline='', buffering=1)
+        log_writer = csv.writer(log_fh)
+        log_writer.writerow(['window', 'timestamp', 'prediction',
+                             'confidence', 'trigger',
+                             'c3_mu', 'c3_beta', 'c4_mu', 'c4_beta'])
         
-        sample_count = 0
         window_count = 0
+        # Running summary counters replace the exit-time DataFrame pass
+        detection_count = 0
+        trigger_count = 0
+        confidence_sum = 0.0
+        
+        # Producer/consumer split: a daemon thread drains the board into
+        # the ring and signals once per step, while this thread runs the
+        # PSD + classifier. Acquisition is never stalled by a slow window,
+        # and the lock is held only for the small ingest copy / the
+        # window read — not for the Bluetooth or console I/O.
+        stop_evt = threading.Event()
+        window_ready = threading.Event()
+        buf_lock = threading.Lock()
+        
+        def _acquire():
+            while not stop_evt.is_set():
+                # Paced by the board's sample clock via
+                # get_board_data_count — no sleep-granularity jitter and
+                # no duplicated samples
+                data = self.stream.wait_for_data(self.step_size)
+                if data.shape[1] == 0:
+                    continue
+                with buf_lock:
+                    self.add_samples(data[Config.C3_CHANNEL],
+                                     data[Config.C4_CHANNEL])
+                window_ready.set()
+        
+        producer = threading.Thread(target=_acquire, daemon=True,
+                                    name='eeg-acquire')
+        producer.start()
         
         try:
             while True:
-                # Get latest sample
-                data = self.stream.get_data(1)
+                if not window_ready.wait(timeout=1.0):
+                    continue
+                window_ready.clear()
                 
-                if data.shape[1] > 0:
-                    c3_sample = data[Config.C3_CHANNEL][0]
-                    c4_sample = data[Config.C4_CHANNEL][0]
-                    
-                    self.add_sample(c3_sample, c4_sample)
-                    sample_count += 1
+                with buf_lock:
+                    trigger, prediction, confidence, erd = self.process_window()
+                if erd is None:
+                    continue
+                window_count += 1
+                
+                # Display — at most ~5 Hz; triggers always print.
+                # Logging and counters below run for every window.
+                now = time.time()
+                if trigger or now - self._last_print >= 0.2:
+                    self._last_print = now
+                    status = "MI DETECTED!" if trigger else "MONITORING  "
+                    pred_symbol = "✓" if prediction == 1 else "o"
+                    conf_bars = "█" * int(confidence * 10)
                     
-                    # Process at step intervals
-                    if sample_count % self.step_size == 0 and len(self.c3_buffer) == self.window_size:
-                        trigger, prediction, confidence, erd = self.process_window()
-                        window_count += 1
-                        
-                        # Display
-                        status = "MI DETECTED!" if trigger else "MONITORING  "
-                        pred_symbol = "✓" if prediction == 1 else "o"
-                        conf_bars = "█" * int(confidence * 10)
-                        
-                        print(f"\r{status} | {pred_symbol} Conf: {conf_bars:<10} {confidence:.0%} | "
-                              f"C3μ: {erd['c3_mu']:6.1f}% | C4μ: {erd['c4_mu']:6.1f}%",
-                              end='', flush=True)
-                        
-                        # Log
-                        log_data.append({
-                            'window': window_count,
-                            'timestamp': time.time(),
-                            'prediction': prediction,
-                            'confidence': confidence,
-                            'trigger': trigger,
-                            **erd
-                        })
-                        
-                        # Send trigger
-                        if trigger and bt_controller:
-                            print(f"\n{'='*60}")
-                            print("TRIGGER ACTIVATED - Sending to device...")
-                            print(f"{'='*60}\n")
-                            bt_controller.send_trigger()
+                    print(f"\r{status} | {pred_symbol} Conf: {conf_bars:<10} {confidence:.0%} | "
+                          f"C3μ: {erd[0]:6.1f}% | C4μ: {erd[2]:6.1f}%",
+                          end='', flush=True)
                 
-                time.sleep(1 / Config.SAMPLING_RATE)
+                # Log
+                log_writer.writerow((window_count, time.time(),
+                                     prediction, confidence,
+                                     int(trigger), *erd.tolist()))
+                detection_count += int(prediction == 1)
+                trigger_count += int(trigger)
+                confidence_sum += confidence
+                
+                # Send trigger
+                if trigger and bt_controller:
+                    print(f"\n{'='*60}")
+                    print("TRIGGER ACTIVATED - Sending to device...")
+                    print(f"{'='*60}\n")
+                    bt_controller.send_trigger()
         
         except KeyboardInterrupt:
             print("\n\n Detection stopped by user")
+        finally:
+            stop_evt.set()
+            log_fh.close()
+        
+        if window_count:
+            print(f"Session log saved: {log_file}")
             
-            # Save log
-            if log_data:
-                df = pd.DataFrame(log_data)
-                df.to_csv(log_file, index=False)
-                print(f"Session log saved: {log_file}")
-                
-                # Print summary
-                print(f"\nSession Summary:")
-                print(f"  Windows processed: {window_count}")
-                print(f"  MI detections: {df['prediction'].sum()}")
-                print(f"  Triggers sent: {df['trigger'].sum()}")
-                print(f"  Avg confidence: {df['confidence'].mean():.1%}")
+            # Print summary
+            print(f"\nSession Summary:")
+            print(f"  Windows processed: {window_count}")
+            print(f"  MI detections: {detection_count}")
+            print(f"  Triggers sent: {trigger_count}")
+            print(f"  Avg confidence: {confidence_sum / window_count:.1%}")
 
 
 # ============================================================================
@@ -812,6 +1368,10 @@ class RealTimeDetector:
 class BluetoothController:
     """Sends trigger commands to Android app"""
     
+    # Only the timestamp varies per trigger, so the JSON payload is a
+    # precomposed bytes template — no dict, encoder or .encode() per send
+    _TRIGGER_TEMPLATE = b'{"command": "TOGGLE_DEVICE", "timestamp": %.6f}'
+
     def __init__(self, mac_address, port=1):
         self.mac = mac_address
         self.port = port
@@ -842,11 +1402,7 @@ class BluetoothController:
             return False
         
         try:
-            message = json.dumps({
-                "command": "TOGGLE_DEVICE",
-                "timestamp": time.time()
-            })
-            self.socket.send(message.encode())
+            self.socket.send(self._TRIGGER_TEMPLATE % time.time())
             print("Trigger sent to Android app")
             return True
         except Exception as e:
@@ -892,12 +1448,12 @@ def main():
         # Training data collection
         print("\n[3/6] Training Data Collection...")
         trainer = TrainingCollector(stream, processor, baseline)
-        training_data = trainer.collect_full_training_set()
+        X_train, y_train = trainer.collect_full_training_set()
         
         # Train classifier
         print("\n[4/6] Training Classifier...")
         classifier = MIClassifier()
-        classifier.train(training_data)
+        classifier.train(X_train, y_train)
         
         # Bluetooth setup
         print("\n[5/6] Bluetooth Connection...")